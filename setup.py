@@ -6,7 +6,7 @@ setup(
     packages=find_packages(where="src"),
     package_dir={"": "src"},
     install_requires=[
-        "duckdb>=0.9.0",
+        "duckdb>=1.0.0",
         "pandas>=2.0.0",
     ],
     python_requires=">=3.8",
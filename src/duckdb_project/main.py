@@ -3,8 +3,12 @@
 Main module for the DuckDB project.
 """
 import os
+import re
+import atexit
+import hashlib
 import logging
-from pathlib import Path
+import tempfile
+from typing import Dict, Optional, Sequence, Tuple
 import duckdb
 
 # Configure logging
@@ -14,26 +18,124 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Root connections, with the settings they were opened with, keyed by
+# (resolved db_path, use_motherduck). Managers hand out cursors off these so
+# connection setup runs once per process. A cached root keeps its database
+# file locked until close_cached_connections() runs.
+_INSTANCE_CACHE: Dict[
+    Tuple[str, bool], Tuple[duckdb.DuckDBPyConnection, Dict[str, object]]
+] = {}
+
+# Whether INSTALL/LOAD of cache_prewarm succeeded, per _INSTANCE_CACHE key, so
+# a missing or unreachable extension is only attempted once per root
+_PREWARM_LOADED: Dict[Tuple[str, bool], bool] = {}
+
+# Error text MotherDuck uses when the requested database does not exist yet
+_MISSING_DB_RE = re.compile(r"not (?:be )?found|does not exist|no database", re.IGNORECASE)
+
+# Rows fetched per batch when streaming the sales summary
+SUMMARY_BATCH_SIZE = 8192
+
+# Table names cannot be bound as parameters, so they are checked against this.
+# Compiled once at import; used with fullmatch so no anchors are needed.
+_IDENT_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+# Sample sales data used by main(), resolved once at import
+SAMPLE_DATA_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "tests", "fixtures", "sample_sales.csv",
+)
+
+# Where main() keeps Parquet conversions of the sample data, outside the tree
+PARQUET_CACHE_DIR = os.path.join(tempfile.gettempdir(), "duckdb_project")
+
+# Known schema of the sample sales CSV, so loading can skip type sniffing
+SALES_COLUMNS: Dict[str, str] = {
+    "date": "DATE",
+    "product_id": "INTEGER",
+    "product_name": "VARCHAR",
+    "category": "VARCHAR",
+    "price": "DOUBLE",
+    "quantity": "INTEGER",
+    "customer_id": "INTEGER",
+}
+
+def _check_ident(name: str) -> str:
+    """
+    Validate a SQL identifier before it is interpolated into a query.
+
+    Args:
+        name (str): Identifier to validate
+
+    Returns:
+        str: The identifier, unchanged
+
+    Raises:
+        ValueError: If the name is not a plain SQL identifier
+    """
+    if not _IDENT_RE.fullmatch(name):
+        raise ValueError(f"Invalid SQL identifier: {name!r}")
+    return name
+
+def close_cached_connections() -> None:
+    """
+    Close and evict every cached root connection.
+
+    A file-backed root stays open after its managers exit, so the database
+    file remains locked against other processes until this is called. It is
+    registered with ``atexit`` and also runs at interpreter shutdown.
+    """
+    _PREWARM_LOADED.clear()
+    while _INSTANCE_CACHE:
+        key, (root, _) = _INSTANCE_CACHE.popitem()
+        try:
+            root.close()
+            logger.info("Closed cached DuckDB connection for %s", key[0])
+        except duckdb.Error as e:
+            logger.warning("Failed to close cached connection for %s: %s", key[0], str(e))
+
+atexit.register(close_cached_connections)
+
 class DuckDBManager:
     """Manager class for DuckDB operations."""
     
-    def __init__(self, db_path: str = ":memory:", use_motherduck: bool = False):
+    def __init__(
+        self,
+        db_path: str = ":memory:",
+        use_motherduck: bool = False,
+        threads: Optional[int] = None,
+        memory_limit: Optional[str] = None,
+    ):
         """
         Initialize DuckDB connection.
         
         Args:
-            db_path (str): Path to the database file or motherduck:// URL
+            db_path (str): Path to the database file, or the MotherDuck
+                database name when ``use_motherduck`` is set (``demo_db`` if
+                left as ``":memory:"``)
             use_motherduck (bool): Whether to use MotherDuck
+            threads (Optional[int]): Worker threads; defaults to DuckDB's own
+                thread count, which honours container CPU limits
+            memory_limit (Optional[str]): DuckDB memory limit such as
+                ``"4GB"``; defaults to DuckDB's own limit
         """
+        self.threads = threads
+        self.memory_limit = memory_limit
         self.use_motherduck = use_motherduck
         if use_motherduck:
             self.token = os.getenv('MOTHERDUCK_TOKEN')
             if not self.token:
                 raise ValueError("MOTHERDUCK_TOKEN environment variable not set")
-            # Use database name without protocol
-            self.db_path = "demo_db"
+            # Use database name without protocol; checked once here since it
+            # is interpolated into the URL and CREATE DATABASE / USE
+            self.db_path = "demo_db" if db_path == ":memory:" else _check_ident(db_path)
+            self.md_url = f"md:{self.db_path}?motherduck_token={self.token}"
+            # Fallback for when the database has not been created yet
+            self.md_root_url = f"md:?motherduck_token={self.token}"
         else:
             self.db_path = db_path
+            self.md_url = None
+            self.md_root_url = None
         self.conn = None
         
     def __enter__(self):
@@ -46,70 +148,377 @@ class DuckDBManager:
         self.close()
         
     def connect(self):
-        """Establish connection to DuckDB."""
+        """
+        Establish connection to DuckDB.
+
+        The first connection to a given database is cached for the lifetime
+        of the process; later managers get a cursor off the cached connection
+        instead of reconnecting. In-memory databases are never cached so each
+        manager keeps its own private database. The cached root, and with it
+        the lock on a database file, outlives the manager; call
+        ``close_cached_connections()`` to release it.
+
+        Raises:
+            ValueError: If the database is already cached with different
+                ``threads`` or ``memory_limit`` settings
+        """
         try:
+            config = self._connection_config()
+            key = self._cache_key()
+            cached = _INSTANCE_CACHE.get(key) if key else None
+            if cached is not None:
+                root, root_config = cached
+                if root_config != config:
+                    raise ValueError(
+                        f"Cached connection to {self.db_path} was opened with settings "
+                        f"{root_config}, not {config}; call close_cached_connections() first"
+                    )
+                self.conn = root.cursor()
+                if self.use_motherduck:
+                    # The default database is per connection, not per instance
+                    self.conn.sql(f"USE {self.db_path}")
+                logger.info("Reusing cached DuckDB connection for %s", self.db_path)
+                return
+
             if self.use_motherduck:
-                # First connect to MotherDuck without specific database
-                md_url = f"md:?motherduck_token={self.token}"
-                self.conn = duckdb.connect(md_url)
-                
-                # Create the database if it doesn't exist
-                self.conn.sql(f"CREATE DATABASE IF NOT EXISTS {self.db_path}")
-                
-                # Now attach to the specific database
-                self.conn.sql(f"USE {self.db_path}")
+                try:
+                    # Attach and select the database in the handshake itself
+                    root = duckdb.connect(self.md_url, config=config)
+                except duckdb.Error as e:
+                    # Only a missing database is recoverable; bad tokens and
+                    # network failures are raised as they are
+                    if not (isinstance(e, duckdb.CatalogException)
+                            or _MISSING_DB_RE.search(str(e))):
+                        raise
+                    logger.warning(
+                        "MotherDuck database %s not available, creating it: %s",
+                        self.db_path, str(e),
+                    )
+                    root = duckdb.connect(self.md_root_url, config=config)
+                    root.sql(f"CREATE DATABASE IF NOT EXISTS {self.db_path}")
+                    root.sql(f"USE {self.db_path}")
                 
                 logger.info("Successfully connected to MotherDuck database: %s", self.db_path)
             else:
-                self.conn = duckdb.connect(self.db_path)
+                root = duckdb.connect(self.db_path, config=config)
                 logger.info("Successfully connected to local DuckDB at %s", self.db_path)
+
+            if key is None:
+                self.conn = root
+            else:
+                _INSTANCE_CACHE[key] = (root, config)
+                self.conn = root.cursor()
+                if self.use_motherduck:
+                    self.conn.sql(f"USE {self.db_path}")
         except Exception as e:
             logger.error("Failed to connect to DuckDB: %s", str(e))
             raise
             
+    def _cache_key(self) -> Optional[Tuple[str, bool]]:
+        """
+        Build the ``_INSTANCE_CACHE`` key for this manager's database.
+
+        File paths are resolved so different spellings of one file share a
+        root connection.
+
+        Returns:
+            Optional[Tuple[str, bool]]: Cache key, or None for in-memory
+                databases, which are never cached
+        """
+        if self.use_motherduck:
+            return (self.db_path, True)
+        if self.db_path == ":memory:":
+            return None
+        return (os.path.realpath(self.db_path), False)
+
+    def _connection_config(self) -> Dict[str, object]:
+        """
+        Build the DuckDB settings applied when a root connection is opened.
+
+        Only explicitly requested settings are included; everything else is
+        left to DuckDB's defaults.
+
+        Returns:
+            Dict[str, object]: Configuration passed to ``duckdb.connect``
+        """
+        config: Dict[str, object] = {}
+        if self.threads:
+            config["threads"] = self.threads
+        if self.memory_limit:
+            config["memory_limit"] = self.memory_limit
+        return config
+
     def close(self):
-        """Close the DuckDB connection."""
+        """
+        Close this manager's connection.
+
+        Any cached root connection stays open, so a database file remains
+        locked until ``close_cached_connections()`` is called.
+        """
         if self.conn:
             self.conn.close()
             logger.info("Closed DuckDB connection")
             
-    def execute_query(self, query: str) -> duckdb.DuckDBPyRelation:
+    def cursor(self) -> duckdb.DuckDBPyConnection:
+        """
+        Open a cursor sharing this manager's database instance.
+
+        Each cursor runs its own queries, so concurrent tasks (for example one
+        per ``ThreadPoolExecutor`` worker) do not serialize on ``self.conn``.
+
+        Returns:
+            duckdb.DuckDBPyConnection: New connection to the same database
+        """
+        cursor = self.conn.cursor()
+        if self.use_motherduck:
+            cursor.sql(f"USE {self.db_path}")
+        return cursor
+
+    def execute_query(
+        self,
+        query: str,
+        params: Optional[Sequence] = None,
+        conn: Optional[duckdb.DuckDBPyConnection] = None,
+    ) -> duckdb.DuckDBPyRelation:
         """
         Execute a SQL query.
         
         Args:
             query (str): SQL query to execute
+            params (Optional[Sequence]): Values bound to ``?`` placeholders
+            conn (Optional[duckdb.DuckDBPyConnection]): Connection to run on,
+                such as one from ``cursor()``; defaults to ``self.conn``
             
         Returns:
             duckdb.DuckDBPyRelation: Query result
+
+        Raises:
+            duckdb.Error: If the query fails; callers log and handle it
         """
-        try:
-            result = self.conn.sql(query)
+        result = (conn or self.conn).sql(query, params=params)
+        if logger.isEnabledFor(logging.DEBUG):
             logger.debug("Successfully executed query: %s", query)
-            return result
-        except Exception as e:
-            logger.error("Failed to execute query: %s", str(e))
-            raise
+        return result
 
-    def load_csv_data(self, csv_path: str, table_name: str) -> None:
+    def load_csv_data(
+        self,
+        csv_path: str,
+        table_name: str,
+        columns: Optional[Dict[str, str]] = None,
+        prewarm: bool = True,
+        parquet_cache: bool = False,
+        parquet_dir: Optional[str] = None,
+        replace: bool = False,
+    ) -> None:
         """
         Load CSV data into a DuckDB table.
+
+        The table is created on first load; later loads append to it,
+        matching columns by name, unless ``replace`` is set.
         
         Args:
             csv_path (str): Path to the CSV file
-            table_name (str): Name of the table to create
+            table_name (str): Name of the table to create or append to
+            columns (Optional[Dict[str, str]]): Column names mapped to DuckDB
+                types. When given, the CSV is read with this schema instead of
+                sniffing types from a sample.
+            prewarm (bool): Load the new table into the buffer pool so the
+                first query does not pay cold-cache I/O
+            parquet_cache (bool): Convert the CSV once to a ``.parquet`` file
+                and expose it as a view named ``table_name`` instead of
+                loading a table. The file name includes a hash of the CSV's
+                absolute path, size, modification time and read options, so a
+                different file, an edited file or changed ``columns`` all
+                convert again. Superseded files are not removed. ``prewarm``
+                does not apply to the view. If the file cannot be written, a
+                table is loaded instead.
+            parquet_dir (Optional[str]): Directory for the Parquet file;
+                defaults to the CSV's own directory
+            replace (bool): Drop any existing table or view named
+                ``table_name`` first, so the load starts from a clean table
+                instead of appending
+
+        Raises:
+            ValueError: If ``table_name`` already exists as a table and
+                ``parquet_cache`` is set, or as a Parquet-backed view and it
+                is not
         """
         try:
-            query = f"CREATE TABLE {table_name} AS SELECT * FROM read_csv_auto('{csv_path}')"
-            self.execute_query(query)
+            if columns:
+                # Types such as DECIMAL(10, 2) are not identifiers; escape quotes
+                schema = ", ".join(
+                    "'%s': '%s'" % (_check_ident(name), dtype.replace("'", "''"))
+                    for name, dtype in columns.items()
+                )
+                source = f"read_csv(?, columns={{{schema}}}, header=true, parallel=true)"
+            else:
+                source = "read_csv_auto(?)"
+            table = _check_ident(table_name)
+            params = (str(csv_path),)
+            existing = self._object_type(table)
+            if replace and existing is not None:
+                self.execute_query(f"DROP {'VIEW' if existing == 'VIEW' else 'TABLE'} {table}")
+                existing = None
+            if parquet_cache and str(csv_path).endswith(".csv"):
+                if existing == "BASE TABLE":
+                    raise ValueError(
+                        f"{table_name} already exists as a table; drop it before "
+                        "loading with parquet_cache"
+                    )
+                write_error = self._create_parquet_view(str(csv_path), table, source, parquet_dir)
+                if write_error is None:
+                    logger.info("Successfully exposed %s as Parquet view %s", csv_path, table_name)
+                    return
+                if existing == "VIEW":
+                    raise ValueError(
+                        f"Could not write the Parquet cache for {table_name}, and it already "
+                        f"exists as a view, so no table can be loaded in its place: {write_error}"
+                    ) from write_error
+            if existing == "VIEW":
+                raise ValueError(
+                    f"{table_name} already exists as a Parquet-backed view; drop it or "
+                    "load with parquet_cache"
+                )
+            # Create the table on first load and append by column name after
+            # that, so repeat loads never drop a table and its cached blocks
+            # and the CSV is read once per load
+            if existing is None:
+                self.execute_query(f"CREATE TABLE {table} AS SELECT * FROM {source}", params)
+            else:
+                self.execute_query(f"INSERT INTO {table} BY NAME SELECT * FROM {source}", params)
+            if prewarm:
+                self._prewarm_table(table_name)
             logger.info("Successfully loaded data from %s into table %s", csv_path, table_name)
         except Exception as e:
             logger.error("Failed to load CSV data: %s", str(e))
             raise
 
-    def get_sales_summary(self) -> duckdb.DuckDBPyRelation:
+    def _object_type(self, name: str) -> Optional[str]:
+        """
+        Look up what a name refers to in the current schema.
+
+        Args:
+            name (str): Table or view name
+
+        Returns:
+            Optional[str]: ``"BASE TABLE"``, ``"VIEW"``, or None if it does not exist
+        """
+        row = self.execute_query(
+            """
+            SELECT table_type FROM information_schema.tables
+            WHERE table_catalog = current_database()
+              AND table_schema = current_schema()
+              AND lower(table_name) = lower(?)
+            """,
+            (name,),
+        ).fetchone()
+        return row[0] if row else None
+
+    def _create_parquet_view(
+        self, csv_path: str, view_name: str, source: str, parquet_dir: Optional[str] = None
+    ) -> Optional[Exception]:
+        """
+        Back a view with a Parquet copy of a CSV file, converting it if needed.
+
+        Args:
+            csv_path (str): Path to the CSV file
+            view_name (str): Validated name of the view to create or replace
+            source (str): ``read_csv`` expression with one ``?`` for the path
+            parquet_dir (Optional[str]): Directory for the Parquet file;
+                defaults to the CSV's own directory
+
+        Returns:
+            Optional[Exception]: None if the view was created, otherwise the
+                error that stopped the Parquet file from being written
+
+        Raises:
+            duckdb.Error: If the CSV itself cannot be read or converted
+        """
+        csv_path = os.path.abspath(csv_path)
+        cache_dir = os.path.abspath(parquet_dir or os.path.dirname(csv_path))
+        stem = os.path.splitext(os.path.basename(csv_path))[0]
+        # Tie the file to this exact CSV and read options, so same-named CSVs
+        # sharing a cache directory, edits and schema changes never collide
+        stat = os.stat(csv_path)
+        identity = "\0".join((csv_path, str(stat.st_size), str(stat.st_mtime_ns), source))
+        digest = hashlib.sha1(identity.encode("utf-8")).hexdigest()[:16]
+        parquet_path = os.path.join(cache_dir, f"{stem}.{digest}.parquet")
+        if not os.path.exists(parquet_path):
+            # Write to a temporary name so a failed COPY never leaves a
+            # partial file that looks fresh
+            partial_path = parquet_path + ".tmp"
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                # COPY targets cannot take parameters; escape quotes
+                target = partial_path.replace("'", "''")
+                self.execute_query(
+                    f"COPY (SELECT * FROM {source}) TO '{target}' (FORMAT PARQUET, COMPRESSION ZSTD)",
+                    (csv_path,),
+                )
+                os.replace(partial_path, parquet_path)
+            except (OSError, duckdb.IOException, duckdb.PermissionException) as e:
+                # Only write failures fall back to a table; CSV conversion and
+                # sniffing errors propagate since a table load would hit them too
+                logger.warning(
+                    "Could not write Parquet cache %s, loading a table instead: %s",
+                    parquet_path, str(e),
+                )
+                return e
+            logger.info("Converted %s to %s", csv_path, parquet_path)
+        # View bodies cannot take parameters either
+        quoted = parquet_path.replace("'", "''")
+        self.execute_query(
+            f"CREATE OR REPLACE VIEW {view_name} AS SELECT * FROM read_parquet('{quoted}')"
+        )
+        return None
+
+    def _prewarm_table(self, table_name: str) -> None:
+        """
+        Prewarm a table's blocks with the ``cache_prewarm`` extension.
+
+        In-memory and MotherDuck tables have no local blocks to warm and are
+        skipped. The extension is installed and loaded once per root
+        connection; if that fails, later calls skip prewarming instead of
+        retrying the download. Prewarming is best effort: failures are
+        logged, not raised.
+
+        Args:
+            table_name (str): Name of the table to prewarm
+        """
+        key = self._cache_key()
+        if self.use_motherduck or key is None:
+            return
+        loaded = _PREWARM_LOADED.get(key)
+        if loaded is False:
+            logger.debug("Skipping prewarm of %s: cache_prewarm is unavailable", table_name)
+            return
+        if loaded is None:
+            try:
+                self.execute_query("INSTALL cache_prewarm FROM community")
+                self.execute_query("LOAD cache_prewarm")
+            except duckdb.Error as e:
+                _PREWARM_LOADED[key] = False
+                logger.warning("cache_prewarm is unavailable, not prewarming: %s", str(e))
+                return
+            _PREWARM_LOADED[key] = True
+        try:
+            self.execute_query("SELECT prewarm(?)", (table_name,)).fetchall()
+            logger.debug("Prewarmed table %s", table_name)
+        except duckdb.Error as e:
+            logger.warning("Failed to prewarm table %s: %s", table_name, str(e))
+
+    def get_sales_summary(
+        self, conn: Optional[duckdb.DuckDBPyConnection] = None
+    ) -> duckdb.DuckDBPyRelation:
         """
         Get a summary of sales data.
+
+        Alongside the raw aggregates, ``items_fmt`` and ``revenue_fmt`` carry
+        display strings formatted by DuckDB.
+
+        Args:
+            conn (Optional[duckdb.DuckDBPyConnection]): Connection to run on;
+                defaults to ``self.conn``
         
         Returns:
             duckdb.DuckDBPyRelation: Summary of sales by category
@@ -119,31 +528,66 @@ class DuckDBManager:
                 category,
                 COUNT(*) as total_transactions,
                 SUM(quantity) as total_items_sold,
-                SUM(price * quantity) as total_revenue
+                SUM(price * quantity) as total_revenue,
+                format('{:,}', SUM(quantity)) as items_fmt,
+                printf('$%,.2f', SUM(price * quantity)) as revenue_fmt
             FROM sales
             GROUP BY category
             ORDER BY total_revenue DESC
         """
-        return self.execute_query(query)
+        return self.execute_query(query, conn=conn)
 
-    def upload_to_motherduck(self, local_table: str, motherduck_table: str) -> None:
+    def get_sales_summary_arrow(
+        self,
+        batch_size: int = SUMMARY_BATCH_SIZE,
+        conn: Optional[duckdb.DuckDBPyConnection] = None,
+    ):
+        """
+        Stream the sales summary as Arrow record batches.
+
+        Requires ``pyarrow``. Batches are handed over without copying through
+        pandas, so the full result is never materialized at once.
+
+        Args:
+            batch_size (int): Maximum number of rows per record batch
+            conn (Optional[duckdb.DuckDBPyConnection]): Connection to run on;
+                defaults to ``self.conn``
+
+        Returns:
+            pyarrow.RecordBatchReader: Reader over the summary batches
+        """
+        summary = self.get_sales_summary(conn)
+        # to_arrow_reader() supersedes fetch_record_batch() in newer DuckDB
+        to_reader = getattr(summary, "to_arrow_reader", None) or summary.fetch_record_batch
+        return to_reader(batch_size)
+
+    def upload_to_motherduck(
+        self,
+        local_table: str,
+        motherduck_table: str,
+        conn: Optional[duckdb.DuckDBPyConnection] = None,
+    ) -> None:
         """
         Upload a local table to MotherDuck.
         
         Args:
             local_table (str): Name of the local table to upload
             motherduck_table (str): Name for the table in MotherDuck
+            conn (Optional[duckdb.DuckDBPyConnection]): Connection to run on;
+                defaults to ``self.conn``
         """
         if not self.use_motherduck:
             raise ValueError("MotherDuck connection not configured")
         
         try:
-            # Create the table in MotherDuck and copy the data
+            # Create the table in MotherDuck and copy the data. This is one
+            # bulk statement run where the data lives; fetching Arrow batches
+            # client-side and re-inserting them would add a round trip.
             copy_query = f"""
-                CREATE OR REPLACE TABLE {motherduck_table} AS 
-                SELECT * FROM {local_table}
+                CREATE OR REPLACE TABLE {_check_ident(motherduck_table)} AS 
+                SELECT * FROM {_check_ident(local_table)}
             """
-            self.execute_query(copy_query)
+            self.execute_query(copy_query, conn=conn)
             logger.info("Successfully uploaded data to table: %s", motherduck_table)
         except Exception as e:
             logger.error("Failed to upload to MotherDuck: %s", str(e))
@@ -151,29 +595,41 @@ class DuckDBManager:
 
 def main():
     """Main function demonstration."""
-    # Get the path to the sample data
-    sample_data_path = Path(__file__).parent.parent.parent / "tests" / "fixtures" / "sample_sales.csv"
-    
     # Check if we have a MotherDuck token
     use_motherduck = bool(os.getenv('MOTHERDUCK_TOKEN'))
     
     # Initialize with MotherDuck support if token is present
     with DuckDBManager(use_motherduck=use_motherduck) as db:
-        # Load sample sales data
-        db.load_csv_data(sample_data_path, "sales")
+        # Load sample sales data; MotherDuck cannot read a local Parquet view
+        db.load_csv_data(
+            SAMPLE_DATA_PATH,
+            "sales",
+            columns=SALES_COLUMNS,
+            parquet_cache=not use_motherduck,
+            parquet_dir=PARQUET_CACHE_DIR,
+            # Persistent databases keep sales between runs; start clean
+            replace=True,
+        )
         
         # Get and display sales summary
         print("\nSales Summary by Category:")
         print("------------------------")
         summary = db.get_sales_summary()
-        result_df = summary.df()
+        columns = [c[0] for c in summary.description]
         
-        # Format the output for better readability
-        for _, row in result_df.iterrows():
-            print(f"\nCategory: {row['category']}")
-            print(f"  Total Transactions: {row['total_transactions']}")
-            print(f"  Total Items Sold: {row['total_items_sold']}")
-            print(f"  Total Revenue: ${row['total_revenue']:,.2f}")
+        # Format the output for better readability, one batch at a time
+        while True:
+            batch = summary.fetchmany(SUMMARY_BATCH_SIZE)
+            if not batch:
+                break
+            rows = [dict(zip(columns, values)) for values in batch]
+            print("\n".join(
+                f"\nCategory: {row['category']}\n"
+                f"  Total Transactions: {row['total_transactions']}\n"
+                f"  Total Items Sold: {row['items_fmt']}\n"
+                f"  Total Revenue: {row['revenue_fmt']}"
+                for row in rows
+            ))
         
         # Upload to MotherDuck if configured
         if use_motherduck:
@@ -2,48 +2,431 @@
 """
 Tests for the main module.
 """
+import duckdb
 import pytest
 from pathlib import Path
-import pandas as pd
-from src.duckdb_project.main import DuckDBManager
+from src.duckdb_project import main as main_module
+from src.duckdb_project.main import (
+    DuckDBManager, SALES_COLUMNS, _INSTANCE_CACHE, close_cached_connections, main
+)
+
+@pytest.fixture(scope="module")
+def shared_db():
+    """One in-memory manager shared by every test in the module."""
+    with DuckDBManager() as manager:
+        yield manager
+
+@pytest.fixture
+def db_file(tmp_path):
+    """Path for a file-backed database whose cached root is closed afterwards."""
+    yield str(tmp_path / "test.duckdb")
+    close_cached_connections()
+
+@pytest.fixture
+def db(shared_db):
+    """Shared manager wrapped in a transaction that is rolled back after each test."""
+    shared_db.conn.begin()
+    yield shared_db
+    shared_db.conn.rollback()
 
 def test_duckdb_manager_connection():
     """Test DuckDB connection."""
     with DuckDBManager() as db:
         assert db.conn is not None
 
-def test_query_execution():
+def test_query_execution(db):
     """Test query execution."""
-    with DuckDBManager() as db:
-        result = db.execute_query("SELECT 42 as number")
-        assert result.fetchone()[0] == 42
+    result = db.execute_query("SELECT 42 as number")
+    assert result.fetchone()[0] == 42
 
-def test_invalid_query():
+def test_invalid_query(db):
     """Test handling of invalid query."""
     with pytest.raises(Exception):
-        with DuckDBManager() as db:
-            db.execute_query("INVALID SQL")
+        db.execute_query("INVALID SQL")
 
 def get_test_data_path():
     """Get path to test data directory."""
     return Path(__file__).parent / "fixtures" / "sample_sales.csv"
 
-def test_load_csv_data():
+def test_load_csv_data(db):
     """Test loading CSV data into DuckDB."""
-    with DuckDBManager() as db:
-        csv_path = get_test_data_path()
-        db.load_csv_data(csv_path, "sales")
-        result = db.execute_query("SELECT COUNT(*) as count FROM sales")
-        assert result.fetchone()[0] == 10
+    csv_path = get_test_data_path()
+    db.load_csv_data(csv_path, "sales")
+    result = db.execute_query("SELECT COUNT(*) as count FROM sales")
+    assert result.fetchone()[0] == 10
+
+def test_load_csv_data_appends_on_reload(db):
+    """Test that loading into an existing table appends rows."""
+    csv_path = get_test_data_path()
+    db.load_csv_data(csv_path, "sales")
+    db.load_csv_data(csv_path, "sales")
+    result = db.execute_query("SELECT COUNT(*) as count FROM sales")
+    assert result.fetchone()[0] == 20
+
+def record_queries(monkeypatch, manager, fail_on=None):
+    """Wrap a manager's execute_query to record queries, optionally failing some."""
+    queries = []
+    real_execute = manager.execute_query
+
+    def recording_execute(query, *args, **kwargs):
+        queries.append(query)
+        if fail_on and query.startswith(fail_on):
+            raise duckdb.IOException("Failed to download extension")
+        return real_execute(query, *args, **kwargs)
 
-def test_sales_summary():
+    monkeypatch.setattr(manager, "execute_query", recording_execute)
+    return queries
+
+def test_prewarm_skipped_in_memory(db, monkeypatch):
+    """Test that in-memory loads never try to install cache_prewarm."""
+    queries = record_queries(monkeypatch, db)
+    db.load_csv_data(get_test_data_path(), "sales")
+    assert not any("cache_prewarm" in query for query in queries)
+
+def test_prewarm_install_failure_is_not_retried(db_file, monkeypatch):
+    """Test that a failed cache_prewarm install is attempted once and loads still succeed."""
+    with DuckDBManager(db_file) as db:
+        queries = record_queries(monkeypatch, db, fail_on="INSTALL cache_prewarm")
+        db.load_csv_data(get_test_data_path(), "sales")
+        db.load_csv_data(get_test_data_path(), "sales")
+        assert sum(query.startswith("INSTALL") for query in queries) == 1
+        assert db.execute_query("SELECT COUNT(*) FROM sales").fetchone()[0] == 20
+
+def test_load_csv_data_reads_csv_once_per_load(db, monkeypatch):
+    """Test that each load scans the CSV in a single statement."""
+    queries = record_queries(monkeypatch, db)
+    db.load_csv_data(get_test_data_path(), "sales")
+    db.load_csv_data(get_test_data_path(), "sales")
+    assert sum("read_csv" in query for query in queries) == 2
+
+def test_load_csv_data_appends_by_name(db):
+    """Test that appending matches columns by name, not position."""
+    db.execute_query(
+        "CREATE TABLE sales (customer_id INTEGER, quantity INTEGER, price DOUBLE, "
+        "category VARCHAR, product_name VARCHAR, product_id INTEGER, date DATE)"
+    )
+    db.load_csv_data(get_test_data_path(), "sales")
+    row = db.execute_query(
+        "SELECT customer_id, quantity, category FROM sales WHERE product_id = 5"
+    ).fetchone()
+    assert row == (102, 2, 'Electronics')
+
+def test_load_csv_data_replace(db):
+    """Test that replace starts from a clean table instead of appending."""
+    db.load_csv_data(get_test_data_path(), "sales")
+    db.load_csv_data(get_test_data_path(), "sales", replace=True)
+    assert db.execute_query("SELECT COUNT(*) FROM sales").fetchone()[0] == 10
+
+def test_sales_summary(db):
     """Test sales summary calculation."""
-    with DuckDBManager() as db:
-        csv_path = get_test_data_path()
-        db.load_csv_data(csv_path, "sales")
-        summary = db.get_sales_summary()
-        df = summary.df()
-        
-        # Electronics should have the highest revenue
-        assert df.iloc[0]['category'] == 'Electronics'
-        assert len(df) == 3  # Electronics, Furniture, Appliances
+    csv_path = get_test_data_path()
+    db.load_csv_data(csv_path, "sales")
+    summary = db.get_sales_summary()
+    df = summary.df()
+
+    # Electronics should have the highest revenue
+    assert df.iloc[0]['category'] == 'Electronics'
+    assert len(df) == 3  # Electronics, Furniture, Appliances
+
+def copy_test_data(directory):
+    """Copy the sample CSV into a scratch directory and return its path."""
+    csv_path = directory / "sales.csv"
+    csv_path.write_bytes(get_test_data_path().read_bytes())
+    return csv_path
+
+def test_load_csv_data_parquet_cache(db, tmp_path):
+    """Test that a CSV is converted to Parquet once and served as a view."""
+    csv_path = copy_test_data(tmp_path)
+
+    db.load_csv_data(str(csv_path), "sales", parquet_cache=True)
+    [parquet_path] = tmp_path.glob("sales.*.parquet")
+    converted_at = parquet_path.stat().st_mtime_ns
+
+    db.load_csv_data(str(csv_path), "sales", parquet_cache=True)
+    assert parquet_path.stat().st_mtime_ns == converted_at
+    result = db.execute_query("SELECT COUNT(*) as count FROM sales")
+    assert result.fetchone()[0] == 10
+
+def test_parquet_cache_reconverts_when_columns_change(db, tmp_path):
+    """Test that changing the read schema does not serve a stale Parquet file."""
+    csv_path = copy_test_data(tmp_path)
+    db.load_csv_data(str(csv_path), "sales", parquet_cache=True)
+    db.load_csv_data(str(csv_path), "sales", columns=SALES_COLUMNS, parquet_cache=True)
+    assert len(list(tmp_path.glob("sales.*.parquet"))) == 2
+    types = db.execute_query("DESCRIBE sales").fetchall()
+    assert [(t[0], t[1]) for t in types] == list(SALES_COLUMNS.items())
+
+def test_parquet_cache_keeps_same_named_csvs_apart(db, tmp_path):
+    """Test that same-named CSVs in different directories get their own Parquet files."""
+    cache_dir = tmp_path / "cache"
+    a_dir, b_dir = tmp_path / "a", tmp_path / "b"
+    a_dir.mkdir()
+    b_dir.mkdir()
+    (a_dir / "sales.csv").write_text("x\n1\n2\n3\n")
+    (b_dir / "sales.csv").write_text("x\n1\n")
+
+    db.load_csv_data(str(a_dir / "sales.csv"), "ta", parquet_cache=True, parquet_dir=str(cache_dir))
+    db.load_csv_data(str(b_dir / "sales.csv"), "tb", parquet_cache=True, parquet_dir=str(cache_dir))
+    assert len(list(cache_dir.glob("sales.*.parquet"))) == 2
+    assert db.execute_query("SELECT COUNT(*) FROM ta").fetchone()[0] == 3
+    assert db.execute_query("SELECT COUNT(*) FROM tb").fetchone()[0] == 1
+
+def test_parquet_cache_reconverts_when_csv_changes(db, tmp_path):
+    """Test that editing the CSV converts it again."""
+    csv_path = tmp_path / "sales.csv"
+    csv_path.write_text("x\n1\n")
+    db.load_csv_data(str(csv_path), "sales", parquet_cache=True)
+    csv_path.write_text("x\n1\n2\n")
+    db.load_csv_data(str(csv_path), "sales", parquet_cache=True)
+    assert db.execute_query("SELECT COUNT(*) FROM sales").fetchone()[0] == 2
+
+def test_parquet_cache_writes_to_parquet_dir(db, tmp_path):
+    """Test that the Parquet file goes to parquet_dir rather than next to the CSV."""
+    csv_path = copy_test_data(tmp_path)
+    cache_dir = tmp_path / "cache"
+    db.load_csv_data(str(csv_path), "sales", parquet_cache=True, parquet_dir=str(cache_dir))
+    assert len(list(cache_dir.glob("sales.*.parquet"))) == 1
+    assert not list(tmp_path.glob("*.parquet"))
+
+def test_parquet_cache_falls_back_to_table(db, tmp_path):
+    """Test that an unwritable Parquet location falls back to a table load."""
+    csv_path = copy_test_data(tmp_path)
+    not_a_dir = tmp_path / "file"
+    not_a_dir.write_text("")
+    db.load_csv_data(str(csv_path), "sales", parquet_cache=True, parquet_dir=str(not_a_dir / "cache"))
+    assert db._object_type("sales") == "BASE TABLE"
+    assert db.execute_query("SELECT COUNT(*) FROM sales").fetchone()[0] == 10
+
+def test_parquet_cache_data_error_is_not_a_write_failure(db, tmp_path, monkeypatch, caplog):
+    """Test that a CSV conversion error propagates without the table fallback."""
+    csv_path = copy_test_data(tmp_path)
+    queries = record_queries(monkeypatch, db)
+    with pytest.raises(duckdb.ConversionException):
+        db.load_csv_data(
+            str(csv_path), "sales", columns={"date": "INTEGER"}, parquet_cache=True
+        )
+    assert sum("read_csv" in query for query in queries) == 1
+    assert "Could not write Parquet cache" not in caplog.text
+
+def test_parquet_cache_fallback_with_existing_view(db, tmp_path):
+    """Test that a failed Parquet write over an existing view reports the write failure."""
+    csv_path = copy_test_data(tmp_path)
+    db.load_csv_data(str(csv_path), "sales", parquet_cache=True)
+    csv_path.write_text("x\n1\n")
+    not_a_dir = tmp_path / "file"
+    not_a_dir.write_text("")
+    with pytest.raises(ValueError, match="Could not write the Parquet cache") as excinfo:
+        db.load_csv_data(
+            str(csv_path), "sales", parquet_cache=True, parquet_dir=str(not_a_dir / "cache")
+        )
+    assert isinstance(excinfo.value.__cause__, OSError)
+
+def test_parquet_cache_conflicts_with_table(db, tmp_path):
+    """Test that a cached load into an existing table raises a clear error."""
+    csv_path = copy_test_data(tmp_path)
+    db.load_csv_data(str(csv_path), "sales")
+    with pytest.raises(ValueError, match="exists as a table"):
+        db.load_csv_data(str(csv_path), "sales", parquet_cache=True)
+
+def test_table_load_conflicts_with_parquet_view(db, tmp_path):
+    """Test that a table load into an existing Parquet view raises a clear error."""
+    csv_path = copy_test_data(tmp_path)
+    db.load_csv_data(str(csv_path), "sales", parquet_cache=True)
+    with pytest.raises(ValueError, match="Parquet-backed view"):
+        db.load_csv_data(str(csv_path), "sales")
+
+def test_sales_summary_arrow(db):
+    """Test streaming the sales summary as Arrow record batches."""
+    pytest.importorskip("pyarrow")
+    db.load_csv_data(get_test_data_path(), "sales")
+    reader = db.get_sales_summary_arrow(batch_size=2)
+    batches = list(reader)
+    assert [batch.num_rows for batch in batches] == [2, 1]
+    assert batches[0].column("category")[0].as_py() == 'Electronics'
+
+def test_sales_summary_on_cursors(db_file):
+    """Test running the summary concurrently on per-thread cursors."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    with DuckDBManager(db_file) as db:
+        db.load_csv_data(get_test_data_path(), "sales", prewarm=False)
+
+        def top_category(_):
+            cursor = db.cursor()
+            try:
+                return db.get_sales_summary(conn=cursor).fetchone()[0]
+            finally:
+                cursor.close()
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            assert list(pool.map(top_category, range(4))) == ['Electronics'] * 4
+
+def test_file_connection_is_reused(db_file, monkeypatch):
+    """Test that managers on the same file share one cached connection."""
+    calls = []
+    real_connect = duckdb.connect
+
+    def counting_connect(*args, **kwargs):
+        calls.append(args)
+        return real_connect(*args, **kwargs)
+
+    monkeypatch.setattr(main_module.duckdb, "connect", counting_connect)
+    with DuckDBManager(db_file) as db:
+        db.execute_query("CREATE TABLE shared AS SELECT 1 AS x")
+    with DuckDBManager(db_file) as db:
+        assert db.execute_query("SELECT x FROM shared").fetchone()[0] == 1
+    assert len(calls) == 1
+
+def test_close_cached_connections(db_file):
+    """Test that cached roots are closed and evicted, releasing the file."""
+    with DuckDBManager(db_file):
+        pass
+    root, _ = next(iter(_INSTANCE_CACHE.values()))
+    close_cached_connections()
+    assert not _INSTANCE_CACHE
+    with pytest.raises(duckdb.ConnectionException):
+        root.sql("SELECT 1")
+
+def test_main_prints_summary(monkeypatch, capsys, tmp_path):
+    """Test that main prints one block per category."""
+    monkeypatch.delenv("MOTHERDUCK_TOKEN", raising=False)
+    monkeypatch.setattr(main_module, "PARQUET_CACHE_DIR", str(tmp_path))
+    main()
+    out = capsys.readouterr().out
+    assert out.count("\nCategory:") == 3
+    assert "Total Revenue: $3,700.99" in out
+
+class TableOnlyManager(DuckDBManager):
+    """Manager that always loads a table, as main() does for MotherDuck."""
+
+    def load_csv_data(self, *args, **kwargs):
+        kwargs["parquet_cache"] = False
+        return super().load_csv_data(*args, **kwargs)
+
+@pytest.mark.parametrize("manager_class", [DuckDBManager, TableOnlyManager])
+def test_main_rerun_on_file_database(db_file, monkeypatch, capsys, tmp_path, manager_class):
+    """Test that rerunning main against a persistent database does not duplicate sales."""
+    monkeypatch.delenv("MOTHERDUCK_TOKEN", raising=False)
+    monkeypatch.setattr(main_module, "PARQUET_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(
+        main_module, "DuckDBManager", lambda **kwargs: manager_class(db_file, **kwargs)
+    )
+
+    main()
+    first = capsys.readouterr().out
+    main()
+    second = capsys.readouterr().out
+    assert first == second
+    assert "Total Transactions: 7" in second
+    with DuckDBManager(db_file) as db:
+        assert db.execute_query("SELECT COUNT(*) FROM sales").fetchone()[0] == 10
+
+def test_sales_summary_formatted_columns(db):
+    """Test that the summary carries DuckDB-formatted display strings."""
+    db.load_csv_data(get_test_data_path(), "sales")
+    row = db.get_sales_summary().select("items_fmt, revenue_fmt").fetchone()
+    assert row == ('11', '$3,700.99')
+
+def test_load_csv_data_with_columns(db):
+    """Test loading CSV data with an explicit schema."""
+    db.load_csv_data(get_test_data_path(), "sales", columns=SALES_COLUMNS)
+    types = db.execute_query("DESCRIBE sales").fetchall()
+    assert [(t[0], t[1]) for t in types] == list(SALES_COLUMNS.items())
+
+def test_query_parameters(db):
+    """Test binding query parameters."""
+    result = db.execute_query("SELECT ? + 1 AS number", (41,))
+    assert result.fetchone()[0] == 42
+
+def test_load_csv_data_rejects_bad_table_name(db):
+    """Test that table names are validated before interpolation."""
+    with pytest.raises(ValueError):
+        db.load_csv_data(get_test_data_path(), "sales; DROP TABLE x")
+
+def test_upload_to_motherduck_rejects_bad_table_name(monkeypatch):
+    """Test that upload table names are validated before interpolation."""
+    monkeypatch.setenv("MOTHERDUCK_TOKEN", "unused")
+    db = DuckDBManager(use_motherduck=True)
+    with pytest.raises(ValueError):
+        db.upload_to_motherduck("sales", "sales_data\nDROP TABLE sales")
+
+def test_cached_connection_rejects_different_settings(db_file):
+    """Test that a cache hit asking for other settings raises instead of ignoring them."""
+    with DuckDBManager(db_file, threads=2):
+        pass
+    spelled_differently = db_file.replace("test.duckdb", "./test.duckdb")
+    with pytest.raises(ValueError):
+        DuckDBManager(spelled_differently, threads=4, memory_limit="1GB").connect()
+    with DuckDBManager(spelled_differently, threads=2) as db:
+        assert db.execute_query("SELECT current_setting('threads')").fetchone()[0] == 2
+
+def test_threads_default_to_duckdb():
+    """Test that threads are left to DuckDB unless given."""
+    assert "threads" not in DuckDBManager()._connection_config()
+
+class FakeMotherDuckConnection:
+    """Stand-in for a MotherDuck connection that records the SQL it receives."""
+
+    def __init__(self):
+        self.queries = []
+
+    def sql(self, query, **kwargs):
+        self.queries.append(query)
+
+    def cursor(self):
+        return self
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def motherduck_connect(monkeypatch):
+    """Replace duckdb.connect with a fake whose first call raises a queued error."""
+    monkeypatch.setenv("MOTHERDUCK_TOKEN", "token")
+    fake = FakeMotherDuckConnection()
+    urls = []
+    errors = []
+
+    def fake_connect(url, **kwargs):
+        urls.append(url)
+        if errors:
+            raise errors.pop(0)
+        return fake
+
+    monkeypatch.setattr(main_module.duckdb, "connect", fake_connect)
+    yield fake, urls, errors
+    close_cached_connections()
+
+def test_motherduck_creates_missing_database(motherduck_connect):
+    """Test that a missing MotherDuck database is created on connect."""
+    fake, urls, errors = motherduck_connect
+    errors.append(duckdb.CatalogException("Catalog Error: database demo_db not found"))
+    with DuckDBManager(use_motherduck=True):
+        pass
+    assert urls == ["md:demo_db?motherduck_token=token", "md:?motherduck_token=token"]
+    assert "CREATE DATABASE IF NOT EXISTS demo_db" in fake.queries
+
+def test_motherduck_connect_error_is_not_retried(motherduck_connect):
+    """Test that other connection errors are raised without a second connect."""
+    _, urls, errors = motherduck_connect
+    errors.append(duckdb.IOException("IO Error: Could not establish connection"))
+    with pytest.raises(duckdb.IOException):
+        DuckDBManager(use_motherduck=True).connect()
+    assert len(urls) == 1
+
+def test_motherduck_database_name(monkeypatch):
+    """Test that the MotherDuck database name is configurable and validated."""
+    monkeypatch.setenv("MOTHERDUCK_TOKEN", "token")
+    assert DuckDBManager(use_motherduck=True).db_path == "demo_db"
+    assert DuckDBManager("analytics", use_motherduck=True).md_url.startswith("md:analytics?")
+    with pytest.raises(ValueError):
+        DuckDBManager("analytics; DROP DATABASE demo_db", use_motherduck=True)
+
+def test_connection_settings():
+    """Test that threads and memory limit are applied at connect time."""
+    with DuckDBManager(threads=2, memory_limit="1GB") as db:
+        settings = dict(db.execute_query(
+            "SELECT name, value FROM duckdb_settings() WHERE name IN ('threads', 'memory_limit')"
+        ).fetchall())
+        assert settings["threads"] == "2"
+        assert settings["memory_limit"].startswith("953")  # 1GB in MiB